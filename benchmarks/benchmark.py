@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+benchmark
+----------------------------------
+
+Rough timings for `rui`. Run with `python benchmarks/benchmark.py`.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rui.rui import Component, System, World
+
+
+class Position(Component):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Velocity(Component):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class MovementSystem(System):
+    def process(self, delta):
+        for entity in self.world.get_entities_by_components(Position,
+                                                            Velocity):
+            position = entity.get_component(Position)
+            velocity = entity.get_component(Velocity)
+            position.x += velocity.x * delta
+            position.y += velocity.y * delta
+
+
+def build_world(entity_count, checked=True):
+    world = World(checked=checked)
+    for i in range(entity_count):
+        entity = world.create_entity()
+        entity.add_component(Position(i, i))
+        entity.add_component(Velocity(1, 1))
+        world.add_entity(entity)
+    world.add_system(MovementSystem())
+    return world
+
+
+def bench_validation(entity_count=1000, ticks=100):
+    print('Validation modes ({0} entities, {1} ticks)'.format(entity_count,
+                                                            ticks))
+    for checked in (True, False):
+        world = build_world(entity_count, checked)
+        seconds = timeit(world.process, number=ticks)
+        print('  checked={0!s:5} {1:8.2f} ms/tick'.format(
+            checked, seconds * 1000 / ticks))
+
+
+class TickSystem(System):
+    def process(self, delta):
+        pass
+
+
+def bench_run(ticks=100000, system_count=5):
+    print('Fast-forward ({0} ticks, {1} systems)'.format(ticks,
+                                                       system_count))
+    world = World()
+    for i in range(system_count):
+        world.add_system(type('TickSystem{0}'.format(i), (TickSystem,), {})())
+
+    def loop():
+        for _ in range(ticks):
+            world.process()
+    for name, function in (('process loop', loop),
+                           ('run', lambda: world.run(ticks))):
+        seconds = timeit(function, number=1)
+        print('  {0:12} {1:10.0f} ticks/s'.format(name, ticks / seconds))
+
+
+if __name__ == '__main__':
+    bench_validation()
+    bench_run()
@@ -44,6 +44,31 @@ class UnmanagedSystemError(Exception):
                 added to world'''.format(self.system)
 
 
+class UnmanagedResourceError(Exception):
+    def __init__(self, resource_type):
+        self.resource_type = resource_type
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return '''{0} you were trying to use in world has not been
+                added to world'''.format(self.resource_type)
+
+
+class UndeclaredResourceError(Exception):
+    def __init__(self, system, resource_type):
+        self.system = system
+        self.resource_type = resource_type
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return '{0} does not declare {1} in reads or writes'.format(
+            self.system, self.resource_type)
+
+
 class NonUniqueTagError(Exception):
     def __init__(self, tag):
         self.tag = tag
@@ -56,6 +81,17 @@ class NonUniqueTagError(Exception):
                 added to world'''.format(self.tag)
 
 
+class CyclicHierarchyError(Exception):
+    def __init__(self, entity):
+        self.entity = entity
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return '{0} cannot be its own ancestor'.format(self.entity)
+
+
 class DeadEntityError(Exception):
     def __init__(self):
         pass
@@ -65,3 +101,16 @@ class DeadEntityError(Exception):
 
     def __str__(self):
         return 'Dead entity cannot be used'
+
+
+class UnsubscribedSystemError(Exception):
+    def __init__(self, system, event_type):
+        self.system = system
+        self.event_type = event_type
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return '{0} is not subscribed to {1}'.format(self.system,
+                                                     self.event_type)
@@ -1,32 +1,64 @@
 # !/usr/bin/env python
 # -*- coding: utf-8 -*-
+import sys
+import threading
 from abc import abstractmethod, ABCMeta
+from bisect import bisect_left, insort
+from collections import deque
 from uuid import uuid1
 from hashlib import md5
 from .exceptions import (DuplicateEntityError, DuplicateSystemError,
                          UnmanagedEntityError, UnmanagedSystemError,
-                         NonUniqueTagError, DeadEntityError)
+                         NonUniqueTagError, DeadEntityError,
+                         UnsubscribedSystemError, CyclicHierarchyError,
+                         UnmanagedResourceError, UndeclaredResourceError)
 
 
 class World(object):
     '''
     A World holds all entities, groups, and systems
+    (optionally) checked is whether entities created by the world check
+    that they are alive on every access. Unchecked worlds create
+    UncheckedEntity instances, which only check when they are added to a
+    world, retagged or killed.
     '''
-    def __init__(self, delta=1):
+    def __init__(self, delta=1, checked=True):
         self._delta = delta
+        self._checked = checked
         self._entities = list()
+        self._active_entities = list()
         self._systems = list()
         self._groups = dict()
+        self._active_groups = dict()
+        self._entity_groups = dict()
+        self._component_bits = dict()
+        self._events = dict()
+        self._event_cursors = dict()
+        self._parents = dict()
+        self._children = dict()
+        self._resources = dict()
+        self._tags = dict()
+        self._component_counts = dict()
+        self._component_bytes = dict()
+        self._component_high_water = dict()
+        self._component_sizes = dict()
+        self._entity_high_water = 0
+        self._group_high_water = dict()
+        self._metrics_listeners = list()
+        self._indexes = dict()
+        self._regions = dict()
+        self._entity_regions = dict()
+        self._ingest_queues = list()
+        self._accumulator = 0
 
     def add_entity(self, entity, second=False):
         ''' Add entity to world.
             entity is of type Entity
         '''
-        if not entity in self._entities:
-            if second:
-                self._entities.append(entity)
-            else:
-                entity.set_world(self)
+        if second:
+            self._attach_entities([entity])
+        elif not self._manages(entity):
+            entity.set_world(self)
         else:
             raise DuplicateEntityError(entity)
 
@@ -46,6 +78,8 @@ class World(object):
         if system not in self._systems:
             system.set_world(self)
             self._systems.append(system)
+            for event_type in system.subscriptions:
+                self.subscribe(system, event_type)
         else:
             raise DuplicateSystemError(system)
 
@@ -56,11 +90,8 @@ class World(object):
         entity is of type Entity
         group is a string that is the name of the group
         '''
-        if entity in self._entities:
-            if group in self._groups:
-                self._groups[group].append(entity)
-            else:
-                self._groups[group] = [entity]
+        if self._manages(entity):
+            self._add_to_group(entity, group)
         else:
             raise UnmanagedEntityError(entity)
 
@@ -68,9 +99,15 @@ class World(object):
         '''
         Removes entity from group
         '''
-        if entity in self._entities:
-            if entity in self._groups[group]:
-                self._groups[group].remove(entity)
+        if self._manages(entity):
+            groups = self._entity_groups.get(entity.get_uuid(), [])
+            if group in groups:
+                groups[:] = [other for other in groups if other != group]
+                uuid = entity.get_uuid()
+                for members in (self._groups[group],
+                                self._active_groups[group]):
+                    members[:] = [member for member in members
+                                  if member.get_uuid() != uuid]
         else:
             raise UnmanagedEntityError(entity)
 
@@ -79,70 +116,550 @@ class World(object):
         Creates Entity
         (optionally) tag is a string that is the tag of the Entity.
         '''
-        return Entity(tag)
+        if self._checked:
+            return Entity(tag)
+        return UncheckedEntity(tag)
 
     def remove_entity(self, entity, second=False):
         '''
         Removes entity from world and kills entity
+        Children of entity are killed as well.
         '''
-        if entity in self._entities:
+        if self._manages(entity):
             if second:
-                for group in self._groups.keys():
-                    if entity in self._groups[group]:
-                        self.deregister_entity_from_group(entity, group)
-                self._entities.remove(entity)
+                subtree = self.walk_hierarchy(entity)
+                self._detach_entities(subtree)
+                for descendant in subtree[1:]:
+                    descendant._clear()
             else:
                 entity.kill()
         else:
             raise UnmanagedEntityError(entity)
 
+    def _manages(self, entity):
+        '''
+        Returns whether entity has been added to this world
+        '''
+        return entity._world is self
+
+    def _attach_entities(self, entities):
+        '''
+        Adds entities to every list and index of the world.
+        Callers check for duplicates and tag conflicts.
+        '''
+        for entity in entities:
+            entity._signature = self.get_signature(
+                map(type, entity.get_components()))
+            self._entities.append(entity)
+            if entity._enabled:
+                self._active_entities.append(entity)
+                self._index_entity(entity)
+            if entity.get_tag():
+                self._tags[entity.get_tag()] = entity
+            for component in entity.get_components():
+                self._count_component(entity, component, 1)
+        self._entity_high_water = max(self._entity_high_water,
+                                      len(self._entities))
+
+    def _detach_entities(self, entities):
+        '''
+        Removes entities from every list and index of the world and
+        detaches them from their parents and children, without killing them
+        '''
+        uuids = set(entity.get_uuid() for entity in entities)
+        regions = set()
+        groups = set()
+        for entity in entities:
+            groups.update(self._entity_groups.pop(entity.get_uuid(), []))
+            parent = self._parents.pop(entity.get_uuid(), None)
+            if parent is not None and parent.get_uuid() not in uuids:
+                self._remove_child(parent, entity)
+            for child in self._children.pop(entity.get_uuid(), []):
+                if child.get_uuid() not in uuids:
+                    del self._parents[child.get_uuid()]
+            if entity._enabled:
+                self._unindex_entity(entity)
+            if entity.get_tag():
+                del self._tags[entity.get_tag()]
+            for component in entity.get_components():
+                self._count_component(entity, component, -1)
+            if entity.get_uuid() in self._entity_regions:
+                regions.add(self._entity_regions.pop(entity.get_uuid()))
+
+        def kept(members):
+            members[:] = [member for member in members
+                          if member.get_uuid() not in uuids]
+        kept(self._entities)
+        kept(self._active_entities)
+        for group in groups:
+            kept(self._groups[group])
+            kept(self._active_groups[group])
+        for region in regions:
+            kept(self._regions[region])
+            if not self._regions[region]:
+                del self._regions[region]
+
+    def _add_to_group(self, entity, group):
+        '''
+        Adds a managed entity to group
+        '''
+        if group in self._groups:
+            self._groups[group].append(entity)
+        else:
+            self._groups[group] = [entity]
+            self._active_groups[group] = []
+        if entity._enabled:
+            self._active_groups[group].append(entity)
+        self._entity_groups.setdefault(entity.get_uuid(), []).append(group)
+        self._group_high_water[group] = max(
+            self._group_high_water.get(group, 0),
+            len(self._groups[group]))
+
+    def set_region(self, entity, region):
+        '''
+        Moves entity to region.
+        region is any hashable value, such as a tuple of chunk coordinates.
+        A region of None removes entity from its region.
+        '''
+        if entity not in self._entities:
+            raise UnmanagedEntityError(entity)
+        old_region = self._entity_regions.pop(entity.get_uuid(), None)
+        if old_region is not None:
+            self._regions[old_region].remove(entity)
+            if not self._regions[old_region]:
+                del self._regions[old_region]
+        if region is not None:
+            self._entity_regions[entity.get_uuid()] = region
+            self._regions.setdefault(region, []).append(entity)
+
+    def get_region(self, entity):
+        '''
+        Gets the region of entity or returns None
+        '''
+        return self._entity_regions.get(entity.get_uuid())
+
+    def get_region_entities(self, region):
+        '''
+        Gets all entities in region
+        '''
+        return self._regions.get(region, [])
+
+    def get_regions(self):
+        '''
+        Gets all regions that have entities in the world
+        '''
+        return list(self._regions)
+
+    def unload_region(self, region):
+        '''
+        Removes all entities in region from the world without killing them
+        and returns them as records that can be saved and passed to
+        load_region. Parent links to entities outside region are dropped.
+        '''
+        entities = list(self.get_region_entities(region))
+        uuids = set(entity.get_uuid() for entity in entities)
+        records = []
+        for entity in entities:
+            parent = self.get_parent(entity)
+            records.append({
+                'entity': entity,
+                'groups': list(self._entity_groups.get(entity.get_uuid(),
+                                                       [])),
+                'parent': parent.get_uuid()
+                if parent is not None and parent.get_uuid() in uuids
+                else None
+            })
+        self._detach_entities(entities)
+        for entity in entities:
+            entity._world = None
+        return records
+
+    def load_region(self, region, records):
+        '''
+        Adds the entities in records, as returned by unload_region, to the
+        world in one batch and puts them in region
+        '''
+        uuids = set(entity.get_uuid() for entity in self._entities)
+        for record in records:
+            entity = record['entity']
+            if entity.get_uuid() in uuids:
+                raise DuplicateEntityError(entity)
+            if entity.get_tag() and entity.get_tag() in self._tags:
+                raise NonUniqueTagError(entity.get_tag())
+        entities = [record['entity'] for record in records]
+        for entity in entities:
+            entity._world = self
+        self._attach_entities(entities)
+        by_uuid = dict((entity.get_uuid(), entity) for entity in entities)
+        for record in records:
+            entity = record['entity']
+            for group in record['groups']:
+                self._add_to_group(entity, group)
+            if record['parent'] is not None:
+                self._parents[entity.get_uuid()] = by_uuid[record['parent']]
+                self._children.setdefault(record['parent'], []).append(entity)
+            self._entity_regions[entity.get_uuid()] = region
+        if entities:
+            self._regions.setdefault(region, []).extend(entities)
+
+    def disable_entity(self, entity):
+        '''
+        Disables entity.
+        A disabled entity keeps its components, tag and groups but is left
+        out of queries and groups until it is enabled again.
+        '''
+        if not self._manages(entity):
+            raise UnmanagedEntityError(entity)
+        self._disable_entities([entity])
+
+    def enable_entity(self, entity):
+        '''
+        Enables a disabled entity
+        '''
+        if not self._manages(entity):
+            raise UnmanagedEntityError(entity)
+        self._enable_entities([entity])
+
+    def disable_group(self, group):
+        '''
+        Disables every entity in group
+        '''
+        self._disable_entities(self._active_groups.get(group, []))
+
+    def enable_group(self, group):
+        '''
+        Enables every entity in group
+        '''
+        self._enable_entities(self._groups.get(group, []))
+
+    def _disable_entities(self, entities):
+        '''
+        Disables managed entities, filtering the active lists once
+        '''
+        entities = [entity for entity in entities if entity._enabled]
+        uuids = set(entity.get_uuid() for entity in entities)
+        groups = set()
+        for entity in entities:
+            entity._enabled = False
+            self._unindex_entity(entity)
+            groups.update(self._entity_groups.get(entity.get_uuid(), []))
+
+        def kept(members):
+            members[:] = [member for member in members
+                          if member.get_uuid() not in uuids]
+        if entities:
+            kept(self._active_entities)
+        for group in groups:
+            kept(self._active_groups[group])
+
+    def _enable_entities(self, entities):
+        '''
+        Enables managed entities
+        '''
+        for entity in entities:
+            if not entity._enabled:
+                entity._enabled = True
+                self._active_entities.append(entity)
+                self._index_entity(entity)
+                for group in self._entity_groups.get(entity.get_uuid(), []):
+                    self._active_groups[group].append(entity)
+
+    def set_parent(self, entity, parent):
+        '''
+        Makes entity a child of parent.
+        entity and parent are of type Entity
+        '''
+        if not self._manages(entity):
+            raise UnmanagedEntityError(entity)
+        if not self._manages(parent):
+            raise UnmanagedEntityError(parent)
+        uuid = entity.get_uuid()
+        if parent.get_uuid() == uuid:
+            raise CyclicHierarchyError(entity)
+        if uuid in self._children:  # Only entities with children can cycle
+            ancestor = self._parents.get(parent.get_uuid())
+            while ancestor is not None:
+                if ancestor.get_uuid() == uuid:
+                    raise CyclicHierarchyError(entity)
+                ancestor = self._parents.get(ancestor.get_uuid())
+        self.remove_parent(entity)
+        self._parents[entity.get_uuid()] = parent
+        self._children.setdefault(parent.get_uuid(), []).append(entity)
+
+    def remove_parent(self, entity):
+        '''
+        Detaches entity from its parent, if it has one
+        '''
+        parent = self._parents.pop(entity.get_uuid(), None)
+        if parent is not None:
+            self._remove_child(parent, entity)
+
+    def _remove_child(self, parent, entity):
+        '''
+        Removes entity from the children of parent
+        '''
+        uuid = entity.get_uuid()
+        siblings = self._children[parent.get_uuid()]
+        siblings[:] = [sibling for sibling in siblings
+                       if sibling.get_uuid() != uuid]
+        if not siblings:
+            del self._children[parent.get_uuid()]
+
+    def get_parent(self, entity):
+        '''
+        Gets the parent of entity or returns None
+        '''
+        return self._parents.get(entity.get_uuid())
+
+    def get_children(self, entity):
+        '''
+        Gets the children of entity
+        '''
+        return self._children.get(entity.get_uuid(), [])
+
+    def get_depth(self, entity):
+        '''
+        Returns the number of ancestors of entity
+        '''
+        depth = 0
+        parent = self.get_parent(entity)
+        while parent is not None:
+            depth += 1
+            parent = self.get_parent(parent)
+        return depth
+
+    def walk_hierarchy(self, *roots):
+        '''
+        Returns roots and all of their descendants in one breadth-first walk,
+        ordered by depth in the world, so every entity comes after its
+        parent and after every entity that has fewer ancestors.
+        Roots that are descendants of other roots are only visited once.
+        (optionally) roots are of type Entity. If no roots are given, the
+        whole hierarchy is walked.
+        '''
+        if roots:
+            roots = [(self.get_depth(root), root) for root in roots]
+            roots.sort(key=lambda depth_and_root: depth_and_root[0])
+        else:
+            roots = [(0, self._parents[children[0].get_uuid()])
+                     for parent, children in self._children.items()
+                     if parent not in self._parents]
+        visited = set()
+        ordered = []
+        level = []
+        next_root = 0
+        while level or next_root < len(roots):
+            if level:
+                depth += 1
+            else:
+                depth = roots[next_root][0]
+            while next_root < len(roots) and roots[next_root][0] == depth:
+                root = roots[next_root][1]
+                next_root += 1
+                if root.get_uuid() not in visited:
+                    visited.add(root.get_uuid())
+                    level.append(root)
+            next_level = []
+            for entity in level:
+                ordered.append(entity)
+                for child in self.get_children(entity):
+                    if child.get_uuid() not in visited:
+                        visited.add(child.get_uuid())
+                        next_level.append(child)
+            level = next_level
+        return ordered
+
     def remove_system(self, system):
         '''
         Removes system from world and kills system
         '''
         if system in self._systems:
             self._systems.remove(system)
+            for event_type in list(self._event_cursors):
+                if type(system) in self._event_cursors[event_type]:
+                    self.unsubscribe(system, event_type)
         else:
             raise UnmanagedSystemError(system)
 
+    def subscribe(self, system, event_type):
+        '''
+        Subscribes system to events of event_type.
+        The system will read every event published from now on.
+        '''
+        if system not in self._systems:
+            raise UnmanagedSystemError(system)
+        if event_type not in self._events:
+            self._events[event_type] = []
+            self._event_cursors[event_type] = {}
+        cursors = self._event_cursors[event_type]
+        if type(system) not in cursors:
+            cursors[type(system)] = len(self._events[event_type])
+
+    def unsubscribe(self, system, event_type):
+        '''
+        Unsubscribes system from events of event_type
+        '''
+        cursors = self._event_cursors.get(event_type, {})
+        if type(system) not in cursors:
+            raise UnsubscribedSystemError(system, event_type)
+        del cursors[type(system)]
+        if cursors:
+            self._compact_events(event_type)
+        else:
+            del self._events[event_type]
+            del self._event_cursors[event_type]
+
+    def publish_event(self, event):
+        '''
+        Publishes event to every system subscribed to its type.
+        Events nobody is subscribed to are dropped.
+        '''
+        if type(event) in self._events:
+            self._events[type(event)].append(event)
+
+    def publish_events(self, *events):
+        '''
+        Publishes multiple events
+        '''
+        for event in events:
+            self.publish_event(event)
+
+    def read_events(self, system, event_type):
+        '''
+        Returns the events of event_type system has not read yet.
+        Events are dropped once every subscriber has read them.
+        '''
+        cursors = self._event_cursors.get(event_type, {})
+        if type(system) not in cursors:
+            raise UnsubscribedSystemError(system, event_type)
+        buffer = self._events[event_type]
+        events = buffer[cursors[type(system)]:]
+        cursors[type(system)] = len(buffer)
+        self._compact_events(event_type)
+        return events
+
+    def _compact_events(self, event_type):
+        '''
+        Drops the events of event_type every subscriber has read
+        '''
+        cursors = self._event_cursors[event_type]
+        read = min(cursors.values())
+        if read:
+            del self._events[event_type][:read]
+            for subscriber in cursors:
+                cursors[subscriber] -= read
+
+    def add_resource(self, resource):
+        '''
+        Adds resource to the world.
+        There is at most one resource per type; a resource replaces any
+        resource of the same type.
+        '''
+        self._resources[type(resource)] = resource
+
+    def get_resource(self, resource_type):
+        '''
+        Gets the resource of resource_type
+        '''
+        if resource_type in self._resources:
+            return self._resources[resource_type]
+        else:
+            raise UnmanagedResourceError(resource_type)
+
+    def has_resource(self, resource_type):
+        '''
+        Returns whether the world has a resource of resource_type
+        '''
+        return resource_type in self._resources
+
+    def remove_resource(self, resource_type):
+        '''
+        Removes the resource of resource_type from world
+        '''
+        if resource_type in self._resources:
+            del self._resources[resource_type]
+        else:
+            raise UnmanagedResourceError(resource_type)
+
     def get_entity_by_tag(self, tag):
         '''
         Get entity by tag
         tag is a string that is the tag of the Entity.
         '''
-        matching_entities = list(filter(lambda entity: entity.get_tag() == tag,
-                                        self._entities))
-        if matching_entities:
-            return matching_entities[0]
-        else:
-            return None
+        return self._tags.get(tag)
+
+    def get_component_bit(self, component_type):
+        '''
+        Returns the signature bit of component_type.
+        Component types are assigned the next free bit the first time
+        they are seen by the world.
+        '''
+        if component_type not in self._component_bits:
+            self._component_bits[component_type] = \
+                1 << len(self._component_bits)
+        return self._component_bits[component_type]
+
+    def get_signature(self, component_types):
+        '''
+        Returns the bitmask of all members of component_types
+        '''
+        signature = 0
+        for component_type in component_types:
+            signature |= self.get_component_bit(component_type)
+        return signature
+
+    def create_query(self, *components, **filters):
+        '''
+        Creates a reusable Query.
+        All members of components must be present on matching entities.
+        (optionally) all, none and any are lists of component types that
+        must all be present, must all be absent, or of which at least one
+        must be present.
+        '''
+        all_of = list(components) + list(filters.pop('all', ()))
+        none_of = filters.pop('none', ())
+        any_of = filters.pop('any', ())
+        if filters:
+            raise TypeError('Unknown query filters: {0}'.format(
+                ', '.join(sorted(filters))))
+        return Query(self, all_of, none_of, any_of)
 
-    def get_entities_by_components(self, *components):
+    def get_entities_by_components(self, *components, **filters):
         '''
         Get entity by list of components
         All members of components must be of type Component
+        (optionally) all, none and any filters work as in create_query
         '''
-        return list(filter(lambda entity:
-                           set(components) <=
-                           set(map(type, entity.get_components())),
-                           self._entities))
+        return self.create_query(*components, **filters).get_entities()
 
     def get_entities(self):
         '''
-        Gets all entities
+        Gets all entities, including disabled ones
         '''
         return self._entities
 
+    def get_active_entities(self):
+        '''
+        Gets all enabled entities
+        '''
+        return self._active_entities
+
     def get_group(self, group):
         '''
-        Gets a specific group
+        Gets the enabled members of a specific group
         group is the string of a Group
         '''
-        if group in self._groups:
-            return self._groups[group]
+        if group in self._active_groups:
+            return self._active_groups[group]
         else:
             return []
 
+    def is_checked(self):
+        '''
+        Returns whether entities created by this world are checked
+        '''
+        return self._checked
+
     def get_delta(self):
         '''
         Returns delta
@@ -158,9 +675,520 @@ class World(object):
     def process(self):
         '''
         Processes entire world and all systems in it
+        Ingest queues are drained before any system is processed.
         '''
+        for ingest_queue in self._ingest_queues:
+            ingest_queue.drain()
         for system in self._systems:
             system.process(self._delta)
+        if self._metrics_listeners:
+            metrics = self.get_metrics()
+            for listener in self._metrics_listeners:
+                listener(metrics)
+
+    def run(self, ticks=None, until=None, substep=None, batch=False):
+        '''
+        Processes the world ticks times in a row, or until until returns
+        True, and returns the number of ticks processed.
+        Systems, ingest queues and metrics listeners are looked up once, so
+        changes to them during the run take effect on the next run.
+        (optionally) until is a function that is called with the world
+        before every tick.
+        (optionally) substep processes the systems with a fixed delta of
+        substep as many times as the world delta allows every tick; the
+        remainder is carried over to the next tick and to the next run with
+        substep. Running without substep drops the remainder. substep must
+        be greater than 0.
+        (optionally) batch calls System.process_ticks once per system with
+        all ticks instead of interleaving systems tick by tick. Ingest
+        queues are drained and metrics listeners are called once for the
+        whole batch. It needs ticks and cannot be combined with until or
+        substep.
+        '''
+        if ticks is None and until is None:
+            raise TypeError('run needs ticks or until')
+        if substep is not None and substep <= 0:
+            raise ValueError('substep must be greater than 0')
+        delta = self._delta
+        drains = [ingest_queue.drain for ingest_queue in self._ingest_queues]
+        processes = [system.process for system in self._systems]
+        listeners = list(self._metrics_listeners)
+        if batch:
+            if ticks is None or until is not None or substep is not None:
+                raise TypeError('batch needs ticks and no until or substep')
+            for drain in drains:
+                drain()
+            for system in list(self._systems):
+                system.process_ticks(delta, ticks)
+            for listener in listeners:
+                listener(self.get_metrics())
+            return ticks
+        if substep is None:
+            self._accumulator = 0
+        ran = 0
+        while ticks is None or ran < ticks:
+            if until is not None and until(self):
+                break
+            for drain in drains:
+                drain()
+            if substep is not None:
+                self._accumulator += delta
+                while self._accumulator >= substep:
+                    self._accumulator -= substep
+                    for process in processes:
+                        process(substep)
+            else:
+                for process in processes:
+                    process(delta)
+            if listeners:
+                metrics = self.get_metrics()
+                for listener in listeners:
+                    listener(metrics)
+            ran += 1
+        return ran
+
+    def create_ingest_queue(self, capacity=0):
+        '''
+        Creates an IngestQueue that other threads can push changes to.
+        The queue is drained at the start of every World.process().
+        (optionally) capacity is the most operations the queue holds
+        between drains; 0 is unbounded.
+        '''
+        ingest_queue = IngestQueue(self, capacity)
+        self._ingest_queues.append(ingest_queue)
+        return ingest_queue
+
+    def remove_ingest_queue(self, ingest_queue):
+        '''
+        Removes ingest_queue from world; it will no longer be drained
+        '''
+        self._ingest_queues.remove(ingest_queue)
+
+    def create_index(self, component_type, field):
+        '''
+        Creates a SortedIndex of enabled entities with a component of
+        component_type, ordered by the attribute field of that component.
+        The index is kept up to date as components are added or replaced;
+        call mark_changed after changing field in place.
+        If the index already exists, it is returned instead.
+        '''
+        index = self.get_index(component_type, field)
+        if index is None:
+            index = SortedIndex(component_type, field)
+            self._indexes.setdefault(component_type, []).append(index)
+            for entity in self.get_entities_by_components(component_type):
+                index._add(entity, entity.get_component(component_type))
+        return index
+
+    def get_index(self, component_type, field):
+        '''
+        Gets the SortedIndex of component_type and field or returns None
+        '''
+        for index in self._indexes.get(component_type, []):
+            if index.get_field() == field:
+                return index
+        return None
+
+    def remove_index(self, index):
+        '''
+        Removes index from world; it will no longer be kept up to date
+        '''
+        self._indexes[index.get_component_type()].remove(index)
+
+    def mark_changed(self, entity, component_type):
+        '''
+        Updates the indexes of component_type after the component of
+        component_type of entity was changed in place
+        '''
+        if entity not in self._entities:
+            raise UnmanagedEntityError(entity)
+        component = entity.get_component(component_type)
+        if entity._enabled and component is not None:
+            for index in self._indexes.get(component_type, []):
+                index._update(entity, component)
+
+    def _index_entity(self, entity):
+        '''
+        Adds an enabled entity to the indexes of its components
+        '''
+        for component in entity.get_components():
+            for index in self._indexes.get(type(component), []):
+                index._add(entity, component)
+
+    def _unindex_entity(self, entity):
+        '''
+        Removes entity from the indexes of its components
+        '''
+        for component in entity.get_components():
+            for index in self._indexes.get(type(component), []):
+                index._discard(entity)
+
+    def get_stats(self):
+        '''
+        Returns counts and estimated sizes of everything in the world.
+        All numbers are kept up to date as the world changes, so this does
+        not scan entities.
+        '''
+        return {
+            'entities': len(self._entities),
+            'active_entities': len(self._active_entities),
+            'entities_high_water': self._entity_high_water,
+            'tags': len(self._tags),
+            'components': dict(
+                (component_type, {
+                    'count': self._component_counts[component_type],
+                    'bytes': self._component_bytes[component_type],
+                    'high_water':
+                        self._component_high_water[component_type]})
+                for component_type in self._component_counts),
+            'groups': dict(
+                (group, {
+                    'size': len(self._groups[group]),
+                    'active': len(self._active_groups[group]),
+                    'high_water': self._group_high_water[group]})
+                for group in self._groups)
+        }
+
+    def get_metrics(self):
+        '''
+        Returns get_stats flattened to a dict of metric names and numbers
+        '''
+        stats = self.get_stats()
+        metrics = {
+            'entities': stats['entities'],
+            'entities.active': stats['active_entities'],
+            'entities.high_water': stats['entities_high_water'],
+            'tags': stats['tags'],
+        }
+        for component_type, values in stats['components'].items():
+            for key, value in values.items():
+                metrics['components.{0}.{1}'.format(
+                    component_type.__name__, key)] = value
+        for group, values in stats['groups'].items():
+            for key, value in values.items():
+                metrics['groups.{0}.{1}'.format(group, key)] = value
+        return metrics
+
+    def add_metrics_listener(self, listener):
+        '''
+        Adds listener, a function that is called with get_metrics() at the
+        end of every World.process()
+        '''
+        self._metrics_listeners.append(listener)
+
+    def remove_metrics_listener(self, listener):
+        '''
+        Removes listener
+        '''
+        self._metrics_listeners.remove(listener)
+
+    def _count_component(self, entity, component, count):
+        '''
+        Adds (count 1) or removes (count -1) component of entity to the
+        stats. Removals subtract the size that was charged when the
+        component was added, so components that grow do not skew the total.
+        '''
+        component_type = type(component)
+        key = (entity.get_uuid(), component_type)
+        if count > 0:
+            size = self._component_sizes[key] = _estimate_size(component)
+        else:
+            size = -self._component_sizes.pop(key)
+        total = self._component_counts.get(component_type, 0) + count
+        self._component_counts[component_type] = total
+        self._component_bytes[component_type] = \
+            self._component_bytes.get(component_type, 0) + size
+        self._component_high_water[component_type] = max(
+            self._component_high_water.get(component_type, 0), total)
+
+    def _component_added(self, entity, component, replaced=None):
+        '''
+        Called by an Entity in this world when it gets a component
+        replaced is the component of the same type it had before, if any
+        '''
+        if replaced is None:
+            entity._signature |= self.get_component_bit(type(component))
+            self._count_component(entity, component, 1)
+        else:
+            key = (entity.get_uuid(), type(component))
+            size = _estimate_size(component)
+            self._component_bytes[type(component)] += \
+                size - self._component_sizes[key]
+            self._component_sizes[key] = size
+        if entity._enabled:
+            for index in self._indexes.get(type(component), []):
+                index._update(entity, component)
+
+    def _tag_changed(self, entity, old_tag):
+        '''
+        Called by an Entity in this world when its tag changes
+        '''
+        if old_tag:
+            del self._tags[old_tag]
+        if entity.get_tag():
+            self._tags[entity.get_tag()] = entity
+
+
+def _estimate_size(component):
+    '''
+    Returns the estimated size of component in bytes
+    '''
+    size = sys.getsizeof(component)
+    if hasattr(component, '__dict__'):
+        size += sys.getsizeof(component.__dict__)
+    return size
+
+
+class IngestQueue(object):
+    '''
+    An IngestQueue lets any thread spawn entities, add components and kill
+    entities in a World. Operations are applied in order when the world
+    drains the queue. IngestQueues are created by World.create_ingest_queue.
+    Pushing never blocks: when the queue is full, the operation is rejected
+    and the push returns False or None.
+    Operations that fail when applied are counted and the last max_errors
+    of their errors are kept until read with pop_errors, so they never stop
+    World.process(). Entities whose spawn failed are killed, so later
+    operations on them are skipped.
+    '''
+    max_errors = 100
+
+    def __init__(self, world, capacity=0):
+        self._world = world
+        self._capacity = capacity
+        self._operations = deque()
+        self._lock = threading.Lock()
+        self._pushed = 0
+        self._rejected = 0
+        self._drained = 0
+        self._failed = 0
+        self._high_water = 0
+        self._errors = deque(maxlen=self.max_errors)
+
+    def spawn(self, tag='', components=(), groups=()):
+        '''
+        Queues an entity to be added to the world with components and
+        registered to groups.
+        Returns the entity, or None if the queue is full. The entity must not
+        be changed directly until it has been drained; use add_component.
+        '''
+        entity = self._world.create_entity(tag)
+        if self._push((self._spawn, entity, list(components), list(groups))):
+            return entity
+        return None
+
+    def add_component(self, entity, component):
+        '''
+        Queues component to be added to entity.
+        Returns False if the queue is full.
+        '''
+        return self._push((self._add_component, entity, component))
+
+    def kill(self, entity):
+        '''
+        Queues entity to be killed.
+        Returns False if the queue is full.
+        '''
+        return self._push((self._kill, entity))
+
+    def drain(self):
+        '''
+        Applies all queued operations in order and returns how many there
+        were. Called by World.process(); only call it from the thread that
+        processes the world.
+        Operations that fail are skipped; their errors can be read with
+        pop_errors.
+        '''
+        with self._lock:
+            operations, self._operations = self._operations, deque()
+        for operation in operations:
+            try:
+                operation[0](*operation[1:])
+            except Exception as error:
+                self._failed += 1
+                self._errors.append(error)
+        self._drained += len(operations)
+        return len(operations)
+
+    def pop_errors(self):
+        '''
+        Returns the errors of the last max_errors operations that failed
+        since the last call and forgets them. Only call it from the thread that processes the
+        world.
+        '''
+        errors = list(self._errors)
+        self._errors.clear()
+        return errors
+
+    def get_stats(self):
+        '''
+        Returns the number of operations pushed, rejected because the queue
+        was full, drained, failed when applied and currently pending, the
+        most ever pending and the capacity
+        '''
+        with self._lock:
+            return {
+                'pushed': self._pushed,
+                'rejected': self._rejected,
+                'drained': self._drained,
+                'failed': self._failed,
+                'pending': len(self._operations),
+                'high_water': self._high_water,
+                'capacity': self._capacity
+            }
+
+    def _push(self, operation):
+        with self._lock:
+            if self._capacity and len(self._operations) >= self._capacity:
+                self._rejected += 1
+                return False
+            self._operations.append(operation)
+            self._pushed += 1
+            self._high_water = max(self._high_water, len(self._operations))
+            return True
+
+    def _spawn(self, entity, components, groups):
+        for component in components:
+            entity.add_component(component)
+        try:
+            self._world.add_entity(entity)
+        except Exception:
+            entity.kill()
+            raise
+        for group in groups:
+            self._world.register_entity_to_group(entity, group)
+
+    def _add_component(self, entity, component):
+        if entity.is_alive():
+            entity.add_component(component)
+
+    def _kill(self, entity):
+        if entity.is_alive():
+            entity.kill()
+
+
+class Query(object):
+    '''
+    A Query matches entities by their component signature.
+    Queries are created by World.create_query and can be reused across
+    ticks; component types are resolved to bits once, on creation.
+    '''
+    def __init__(self, world, all_of=(), none_of=(), any_of=()):
+        self._world = world
+        self._all = world.get_signature(all_of)
+        self._none = world.get_signature(none_of)
+        self._any = world.get_signature(any_of)
+
+    def matches(self, entity):
+        '''
+        Returns whether entity matches this query
+        '''
+        signature = entity._signature
+        return (signature & self._all == self._all and
+                not signature & self._none and
+                (not self._any or bool(signature & self._any)))
+
+    def get_entities(self):
+        '''
+        Returns all enabled entities in the world matching this query
+        '''
+        all_mask, none_mask, any_mask = self._all, self._none, self._any
+        if any_mask:
+            return [entity for entity in self._world._active_entities
+                    if entity._signature & all_mask == all_mask and
+                    not entity._signature & none_mask and
+                    entity._signature & any_mask]
+        return [entity for entity in self._world._active_entities
+                if entity._signature & all_mask == all_mask and
+                not entity._signature & none_mask]
+
+
+class SortedIndex(object):
+    '''
+    A SortedIndex keeps entities ordered by a field of one of their
+    components. SortedIndexes are created by World.create_index.
+    Entities with equal values are ordered by uuid.
+    '''
+    def __init__(self, component_type, field):
+        self._component_type = component_type
+        self._field = field
+        self._entries = list()
+        self._values = dict()
+        self._entities = dict()
+
+    def get_component_type(self):
+        '''
+        Returns the component type this index is over
+        '''
+        return self._component_type
+
+    def get_field(self):
+        '''
+        Returns the name of the field this index is ordered by
+        '''
+        return self._field
+
+    def get_entities(self, reverse=False):
+        '''
+        Returns all entities in order
+        (optionally) reverse returns them from the largest value down
+        '''
+        entities = [self._entities[uuid] for value, uuid in self._entries]
+        if reverse:
+            entities.reverse()
+        return entities
+
+    def get_range(self, low=None, high=None):
+        '''
+        Returns the entities with low <= value < high in order
+        (optionally) low and high can be left out to leave the range open
+        '''
+        start, end = 0, len(self._entries)
+        if low is not None:
+            start = bisect_left(self._entries, (low,))
+        if high is not None:
+            end = bisect_left(self._entries, (high,))
+        return [self._entities[uuid]
+                for value, uuid in self._entries[start:end]]
+
+    def get_top(self, count, reverse=False):
+        '''
+        Returns the count entities with the smallest values in order
+        (optionally) reverse returns the count largest, largest first
+        '''
+        if reverse:
+            entries = self._entries[:-count - 1:-1] if count else []
+        else:
+            entries = self._entries[:count]
+        return [self._entities[uuid] for value, uuid in entries]
+
+    def _add(self, entity, component):
+        uuid = entity.get_uuid()
+        value = getattr(component, self._field)
+        self._values[uuid] = value
+        self._entities[uuid] = entity
+        insort(self._entries, (value, uuid))
+
+    def _discard(self, entity):
+        uuid = entity.get_uuid()
+        if uuid in self._values:
+            value = self._values.pop(uuid)
+            del self._entities[uuid]
+            del self._entries[bisect_left(self._entries, (value, uuid))]
+
+    def _update(self, entity, component):
+        uuid = entity.get_uuid()
+        if uuid not in self._values:
+            self._add(entity, component)
+        elif self._values[uuid] != getattr(component, self._field):
+            self._discard(entity)
+            self._add(entity, component)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self.get_entities())
 
 
 class Entity(object):
@@ -172,6 +1200,8 @@ class Entity(object):
         self._tag = tag
         self._uuid = uuid1().int
         self._components = list()
+        self._signature = 0
+        self._enabled = True
         self._world = None
 
     def check_alive(function):
@@ -183,8 +1213,15 @@ class Entity(object):
                 return function(self, *args, **kwargs)
             else:
                 raise DeadEntityError()
+        check_and_call.unchecked = function
         return check_and_call
 
+    def is_alive(self):
+        '''
+        Returns whether the entity has not been killed
+        '''
+        return self._uuid is not None
+
     @check_alive
     def set_world(self, world):
         '''
@@ -220,17 +1257,70 @@ class Entity(object):
         if self._world:
             if self._world.get_entity_by_tag(tag):
                 raise NonUniqueTagError(tag)
-        self._tag = tag
+            old_tag, self._tag = self._tag, tag
+            self._world._tag_changed(self, old_tag)
+        else:
+            self._tag = tag
+
+    @check_alive
+    def is_enabled(self):
+        '''
+        Returns whether the entity is enabled
+        '''
+        return self._enabled
+
+    @check_alive
+    def set_parent(self, parent):
+        '''
+        Makes this entity a child of parent in its world
+        '''
+        if not self._world:
+            raise UnmanagedEntityError(self)
+        self._world.set_parent(self, parent)
+
+    @check_alive
+    def get_parent(self):
+        '''
+        Returns the parent entity or None
+        '''
+        if self._world:
+            return self._world.get_parent(self)
+        return None
+
+    @check_alive
+    def get_children(self):
+        '''
+        Returns all child entities
+        '''
+        if self._world:
+            return self._world.get_children(self)
+        return []
+
+    @check_alive
+    def mark_changed(self, component_type):
+        '''
+        Tells the world the component of component_type was changed in
+        place, so indexes over it are updated
+        '''
+        if self._world:
+            self._world.mark_changed(self, component_type)
 
     @check_alive
     def kill(self):
-        '''Kills Entity'''
+        '''Kills Entity and all of its children'''
         if self._world:
             self._world.remove_entity(self, True)
-            self._world = None
+        self._clear()
+
+    def _clear(self):
+        '''
+        Marks the entity dead after it was removed from its world
+        '''
+        self._world = None
         self._tag = None
         self._uuid = None
         self._components = None
+        self._signature = 0
 
     @check_alive
     def add_component(self, component):
@@ -239,8 +1329,14 @@ class Entity(object):
         '''
         if component not in self._components:
             self._components.append(component)
+            if self._world:
+                self._world._component_added(self, component)
         else:  # Replace Component
-            self._components[self._components.index(component)] = component
+            index = self._components.index(component)
+            replaced = self._components[index]
+            self._components[index] = component
+            if self._world:
+                self._world._component_added(self, component, replaced)
 
     @check_alive
     def get_component(self, component_type):
@@ -263,6 +1359,12 @@ class Entity(object):
         '''
         return self._components
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_world'] = None
+        state['_signature'] = 0
+        return state
+
     def __str__(self):
         return 'Entity {0}'.format(self.__class__)
 
@@ -279,6 +1381,29 @@ class Entity(object):
         return int(md5(self.__repr__()).hexdigest(), 16)
 
 
+class UncheckedEntity(Entity):
+    '''
+    An Entity whose accessors do not check if it is alive.
+    Dead entities are only detected when they are added to a world,
+    retagged or killed; using any other method of a dead UncheckedEntity
+    is undefined.
+    '''
+    get_uuid = Entity.get_uuid.unchecked
+    get_tag = Entity.get_tag.unchecked
+    is_enabled = Entity.is_enabled.unchecked
+    add_component = Entity.add_component.unchecked
+    get_component = Entity.get_component.unchecked
+    get_components = Entity.get_components.unchecked
+
+    def __eq__(self, other):
+        return self._uuid == other.get_uuid()
+
+    def __ne__(self, other):
+        return self._uuid != other.get_uuid()
+
+    __hash__ = Entity.__hash__
+
+
 class Component(object):
     def __str__(self):
         return 'Component {0}'.format(self.__class__)
@@ -297,7 +1422,17 @@ class Component(object):
 
 
 class System(object):
+    '''
+    Systems are processed by the World every tick.
+    (optionally) subscriptions is a list of event types the system is
+    subscribed to when it is added to a World.
+    (optionally) reads and writes are lists of the component and resource
+    types the system reads and writes.
+    '''
     __metaclass__ = ABCMeta
+    subscriptions = ()
+    reads = ()
+    writes = ()
 
     def set_world(self, world):
         '''
@@ -305,10 +1440,42 @@ class System(object):
         '''
         self.world = world
 
+    def get_resource(self, resource_type):
+        '''
+        Gets the resource of resource_type from the world.
+        In checked worlds resource_type must be declared in reads or
+        writes.
+        '''
+        if (self.world.is_checked() and resource_type not in self.reads and
+                resource_type not in self.writes):
+            raise UndeclaredResourceError(self, resource_type)
+        return self.world.get_resource(resource_type)
+
+    def publish_event(self, event):
+        '''
+        Publishes event to the world this system belongs to
+        '''
+        self.world.publish_event(event)
+
+    def read_events(self, event_type):
+        '''
+        Returns the events of event_type this system has not read yet
+        '''
+        return self.world.read_events(self, event_type)
+
     @abstractmethod
     def process(self, delta):
         '''Update the system'''
 
+    def process_ticks(self, delta, ticks):
+        '''
+        Update the system ticks times in a row.
+        Called by World.run with batch; override it to update all ticks at
+        once.
+        '''
+        for _ in range(ticks):
+            self.process(delta)
+
     def __str__(self):
         return 'System {0}'.format(self.__class__)
 
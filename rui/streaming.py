@@ -0,0 +1,190 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import pickle
+import threading
+from hashlib import md5
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+from .rui import System
+
+
+class RegionStore(object):
+    '''
+    A RegionStore saves regions unloaded from a World as files in directory.
+    Components of saved entities must be picklable.
+    '''
+    def __init__(self, directory):
+        self._directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def get_path(self, region):
+        '''
+        Returns the path of the file region is saved to
+        '''
+        name = md5(repr(region).encode('utf-8')).hexdigest()
+        return os.path.join(self._directory, '{0}.region'.format(name))
+
+    def save(self, region, records):
+        '''
+        Saves records, as returned by World.unload_region
+        '''
+        with open(self.get_path(region), 'wb') as region_file:
+            pickle.dump(records, region_file, pickle.HIGHEST_PROTOCOL)
+
+    def load(self, region):
+        '''
+        Loads the records of region or returns an empty list if region was
+        never saved
+        '''
+        path = self.get_path(region)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'rb') as region_file:
+            return pickle.load(region_file)
+
+
+class RegionStreamingSystem(System):
+    '''
+    Keeps the regions of interest loaded in the world and all other regions
+    saved in store.
+    Regions are saved and loaded on a background thread; loaded regions are
+    merged into the world when the system is processed.
+    Regions that have entities in the world but were not loaded by this
+    system, such as regions entities were moved to, are loaded and merged
+    with their saved entities before they can be saved again.
+    (optionally) background can be False to save and load regions during
+    process instead.
+    '''
+    def __init__(self, store, background=True):
+        self._store = store
+        self._background = background
+        self._interest = set()
+        self._loaded = set()
+        self._loading = set()
+        self._saving = set()
+        self._failed = dict()
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._errors = queue.Queue()
+        self._worker = None
+
+    def set_interest(self, regions):
+        '''
+        Sets the regions that should be loaded
+        '''
+        self._interest = set(regions)
+
+    def get_interest(self):
+        '''
+        Returns the regions that should be loaded
+        '''
+        return set(self._interest)
+
+    def get_loaded_regions(self):
+        '''
+        Returns the regions that are loaded in the world
+        '''
+        return set(self._loaded)
+
+    def process(self, delta):
+        '''
+        Unloads regions that are no longer of interest, starts loading new
+        regions of interest and merges regions that finished loading.
+        If a region cannot be saved or merged, its records are kept; they
+        are merged back if the region is wanted and saved again otherwise.
+        If a region cannot be loaded, loading is retried on the next
+        process. In all three cases the error is raised.
+        '''
+        if not self._errors.empty():
+            raise self._errors.get()
+        self._handle_results()
+        for region in self._loaded - self._interest:
+            records = self.world.unload_region(region)
+            self._loaded.discard(region)
+            self._saving.add(region)
+            self._submit(self._save, region, records)
+        wanted = self._interest | set(self.world.get_regions())
+        for region in list(self._failed):
+            records = self._failed.pop(region)
+            if region in wanted:
+                self._loading.add(region)
+                self._results.put(('load', region, records, None))
+            else:
+                self._saving.add(region)
+                self._submit(self._save, region, records)
+        for region in wanted - self._loaded - self._loading - self._saving:
+            self._loading.add(region)
+            self._submit(self._load, region)
+        self._handle_results()
+
+    def _handle_results(self):
+        '''
+        Merges finished loads and records finished saves
+        '''
+        while True:
+            try:
+                action, region, records, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if action == 'save':
+                self._saving.discard(region)
+                if error is not None:
+                    self._failed[region] = records
+                    raise error
+                continue
+            self._loading.discard(region)
+            if error is not None:
+                raise error
+            try:
+                self.world.load_region(region, records)
+            except Exception:
+                self._failed[region] = records
+                raise
+            self._loaded.add(region)
+
+    def wait(self):
+        '''
+        Blocks until all pending saves and loads are done.
+        Call this before exiting so unloaded regions are not lost.
+        '''
+        self._tasks.join()
+
+    def _load(self, region):
+        try:
+            records = self._store.load(region)
+        except Exception as error:
+            self._results.put(('load', region, None, error))
+        else:
+            self._results.put(('load', region, records, None))
+
+    def _save(self, region, records):
+        try:
+            self._store.save(region, records)
+        except Exception as error:
+            self._results.put(('save', region, records, error))
+        else:
+            self._results.put(('save', region, None, None))
+
+    def _submit(self, function, *args):
+        if not self._background:
+            function(*args)
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work)
+            self._worker.daemon = True
+            self._worker.start()
+        self._tasks.put((function, args))
+
+    def _work(self):
+        while True:
+            function, args = self._tasks.get()
+            try:
+                function(*args)
+            except Exception as error:
+                self._errors.put(error)
+            finally:
+                self._tasks.task_done()
@@ -8,16 +8,22 @@ test_rui
 Tests for `rui` module.
 """
 
+import shutil
 import sys
+import tempfile
+import threading
 if sys.version_info < (2, 7):
     import unittest2 as unittest
 else:
     import unittest
 
-from rui.rui import Component, System, World
+from rui.rui import Component, Entity, System, UncheckedEntity, World
+from rui.streaming import RegionStore, RegionStreamingSystem
 from rui.exceptions import (DuplicateEntityError, DuplicateSystemError,
                             UnmanagedEntityError, UnmanagedSystemError,
-                            NonUniqueTagError, DeadEntityError)
+                            NonUniqueTagError, DeadEntityError,
+                            UnsubscribedSystemError, CyclicHierarchyError,
+                            UnmanagedResourceError, UndeclaredResourceError)
 
 
 class Counter(Component):
@@ -30,6 +36,11 @@ class Empty(Component):
         pass
 
 
+class Frozen(Component):
+    def __init__(self):
+        pass
+
+
 class CountSystem(System):
     def process(self, delta):
         entities = self.world.get_entities_by_components(Counter)
@@ -38,6 +49,63 @@ class CountSystem(System):
             entity.get_component(Counter).count += (1 * delta)
 
 
+class BatchCountSystem(CountSystem):
+    def process_ticks(self, delta, ticks):
+        for entity in self.world.get_entities_by_components(Counter):
+            entity.get_component(Counter).count += ticks * delta
+
+
+class Damage(object):
+    def __init__(self, amount):
+        self.amount = amount
+
+
+class DamageSystem(System):
+    def process(self, delta):
+        for entity in self.world.get_entities_by_components(Counter):
+            self.publish_event(Damage(entity.get_component(Counter).count))
+
+
+class HealthSystem(System):
+    subscriptions = (Damage,)
+
+    def __init__(self):
+        self.damage = 0
+
+    def process(self, delta):
+        for event in self.read_events(Damage):
+            self.damage += event.amount
+
+
+class Clock(object):
+    def __init__(self):
+        self.time = 0
+
+
+class ClockSystem(System):
+    writes = (Clock,)
+
+    def process(self, delta):
+        self.get_resource(Clock).time += delta
+
+
+class FlakyStore(RegionStore):
+    def __init__(self, directory):
+        RegionStore.__init__(self, directory)
+        self.fail_saves = False
+        self.fail_loads = False
+
+    def save(self, region, records):
+        if self.fail_saves:
+            raise IOError('save failed')
+        RegionStore.save(self, region, records)
+
+    def load(self, region):
+        if self.fail_loads:
+            raise IOError('load failed')
+        return RegionStore.load(self, region)
+
+
 class TestRui(unittest.TestCase):
 
     def setUp(self):
@@ -79,6 +147,35 @@ class TestRui(unittest.TestCase):
         self.assertEqual(len(empty_entities), 2)
         self.assertTrue(empty_entity in empty_entities)
 
+    def test_query_filters(self):
+        counting = self.world.create_entity()
+        counting.add_component(Counter(0))
+        frozen = self.world.create_entity()
+        frozen.add_component(Counter(0))
+        frozen.add_component(Frozen())
+        empty = self.world.create_entity()
+        empty.add_component(Empty())
+        self.world.add_entities(counting, frozen, empty)
+
+        self.assertEqual(self.world.get_entities_by_components(
+            Counter, none=[Frozen]), [counting])
+        self.assertEqual(self.world.get_entities_by_components(
+            all=[Counter, Frozen]), [frozen])
+        self.assertEqual(len(self.world.get_entities_by_components(
+            any=[Frozen, Empty])), 2)
+        with self.assertRaises(TypeError):
+            self.world.get_entities_by_components(Counter, some=[Empty])
+
+    def test_query_reuse(self):
+        query = self.world.create_query(Counter, none=[Frozen])
+        entity = self.world.create_entity()
+        entity.add_component(Counter(0))
+        self.world.add_entity(entity)
+        self.assertEqual(query.get_entities(), [entity])
+        entity.add_component(Frozen())
+        self.assertFalse(query.matches(entity))
+        self.assertEqual(query.get_entities(), [])
+
     ## Testing Entities
     def test_add_entity(self):
         entity = self.world.create_entity()
@@ -127,6 +224,386 @@ class TestRui(unittest.TestCase):
         with self.assertRaises(DeadEntityError):
             entity.kill()
 
+    def test_disable_entity(self):
+        entity = self.world.create_entity('SLEEPER')
+        entity.add_component(Counter(0))
+        self.world.add_entity(entity)
+        self.world.register_entity_to_group(entity, 'SLEEPING')
+        self.world.add_system(CountSystem())
+
+        self.world.disable_entity(entity)
+        self.assertFalse(entity.is_enabled())
+        self.world.process()
+        self.assertEqual(entity.get_component(Counter).count, 0)
+        self.assertEqual(self.world.get_entities_by_components(Counter), [])
+        self.assertEqual(self.world.get_group('SLEEPING'), [])
+        self.assertEqual(self.world.get_entity_by_tag('SLEEPER'), entity)
+        self.assertTrue(entity in self.world.get_entities())
+
+        self.world.enable_entity(entity)
+        self.world.process()
+        self.assertEqual(entity.get_component(Counter).count, 1)
+        self.assertEqual(self.world.get_group('SLEEPING'), [entity])
+
+    def test_disable_group(self):
+        entities = [self.world.create_entity() for _ in range(3)]
+        self.world.add_entities(*entities)
+        for entity in entities[:2]:
+            self.world.register_entity_to_group(entity, 'DORMANT')
+        self.world.disable_group('DORMANT')
+        self.assertEqual(self.world.get_active_entities(), entities[2:])
+        self.world.enable_group('DORMANT')
+        self.assertEqual(len(self.world.get_group('DORMANT')), 2)
+        self.assertEqual(len(self.world.get_active_entities()), 3)
+
+    def test_disable_large_group(self):
+        entities = [self.world.create_entity() for _ in range(4000)]
+        self.world.add_entities(*entities)
+        for entity in entities[:2000]:
+            self.world.register_entity_to_group(entity, 'OFFSCREEN')
+        self.world.register_entity_to_group(entities[0], 'PLAYER')
+        self.world.disable_group('OFFSCREEN')
+        self.assertEqual(self.world.get_active_entities(), entities[2000:])
+        self.assertEqual(self.world.get_group('PLAYER'), [])
+        self.world.enable_group('OFFSCREEN')
+        self.assertEqual(len(self.world.get_active_entities()), 4000)
+        self.assertEqual(self.world.get_group('PLAYER'), [entities[0]])
+        self.world.deregister_entity_from_group(entities[0], 'OFFSCREEN')
+        self.assertEqual(len(self.world.get_group('OFFSCREEN')), 1999)
+
+    def test_hierarchy(self):
+        root, arm, hand, leg = [self.world.create_entity() for _ in range(4)]
+        self.world.add_entities(root, arm, hand, leg)
+        hand.set_parent(arm)
+        arm.set_parent(root)
+        self.world.set_parent(leg, root)
+
+        self.assertEqual(root.get_children(), [arm, leg])
+        self.assertEqual(hand.get_parent(), arm)
+        self.assertEqual(root.get_parent(), None)
+        self.assertEqual(self.world.get_depth(hand), 2)
+        self.assertEqual(self.world.walk_hierarchy(), [root, arm, leg, hand])
+        self.assertEqual(self.world.walk_hierarchy(hand, arm), [arm, hand])
+        self.assertEqual(self.world.walk_hierarchy(arm, leg), [arm, leg, hand])
+
+        leg.set_parent(arm)
+        self.assertEqual(root.get_children(), [arm])
+        self.assertEqual(arm.get_children(), [hand, leg])
+        with self.assertRaises(CyclicHierarchyError):
+            root.set_parent(hand)
+
+    def test_kill_hierarchy(self):
+        root, child, grandchild = [self.world.create_entity()
+                                   for _ in range(3)]
+        self.world.add_entities(root, child, grandchild)
+        child.set_parent(root)
+        grandchild.set_parent(child)
+        child.kill()
+        self.assertEqual(self.world.get_entities(), [root])
+        self.assertEqual(root.get_children(), [])
+        with self.assertRaises(DeadEntityError):
+            grandchild.kill()
+
+    def test_stats(self):
+        entities = [self.world.create_entity() for _ in range(3)]
+        for entity in entities:
+            entity.add_component(Counter(0))
+        entities[0].add_component(Empty())
+        self.world.add_entities(*entities)
+        self.world.register_entity_to_group(entities[0], 'GROUP')
+        entities[1].set_tag('TAG')
+        entities[2].kill()
+
+        stats = self.world.get_stats()
+        self.assertEqual(stats['entities'], 2)
+        self.assertEqual(stats['entities_high_water'], 3)
+        self.assertEqual(stats['tags'], 1)
+        self.assertEqual(stats['components'][Counter]['count'], 2)
+        self.assertEqual(stats['components'][Counter]['high_water'], 3)
+        self.assertTrue(stats['components'][Counter]['bytes'] > 0)
+        self.assertEqual(stats['groups']['GROUP']['size'], 1)
+        self.assertEqual(self.world.get_entity_by_tag('TAG'), entities[1])
+
+        counter = entities[0].get_component(Counter)
+        for i in range(20):
+            setattr(counter, 'field{0}'.format(i), i)
+        entities[0].add_component(Counter(1))
+        entities[0].kill()
+        entities[1].get_component(Counter).extra = [0] * 100
+        entities[1].kill()
+        stats = self.world.get_stats()
+        self.assertEqual(stats['components'][Counter],
+                         {'count': 0, 'bytes': 0, 'high_water': 3})
+        self.assertEqual(stats['components'][Empty]['bytes'], 0)
+
+    def test_metrics_listener(self):
+        metrics = []
+        self.world.add_metrics_listener(metrics.append)
+        entity = self.world.create_entity()
+        entity.add_component(Counter(0))
+        self.world.add_entity(entity)
+        self.world.process()
+        self.world.remove_metrics_listener(metrics.append)
+        self.world.process()
+        self.assertEqual(len(metrics), 1)
+        self.assertEqual(metrics[0]['entities'], 1)
+        self.assertEqual(metrics[0]['components.Counter.count'], 1)
+
+    def test_sorted_index(self):
+        entities = [self.world.create_entity() for _ in range(4)]
+        for count, entity in zip([3, 1, 2, 5], entities):
+            entity.add_component(Counter(count))
+        self.world.add_entities(*entities[:3])
+        index = self.world.create_index(Counter, 'count')
+        self.assertEqual(self.world.create_index(Counter, 'count'), index)
+        self.world.add_entity(entities[3])
+        self.assertEqual(index.get_entities(),
+                         [entities[1], entities[2], entities[0], entities[3]])
+
+        entities[3].add_component(Counter(0))
+        entities[0].get_component(Counter).count = 4
+        entities[0].mark_changed(Counter)
+        self.assertEqual(index.get_entities(),
+                         [entities[3], entities[1], entities[2], entities[0]])
+        self.assertEqual(index.get_range(1, 4), [entities[1], entities[2]])
+        self.assertEqual(index.get_top(2), [entities[3], entities[1]])
+        self.assertEqual(index.get_top(1, reverse=True), [entities[0]])
+
+        self.world.disable_entity(entities[1])
+        entities[2].kill()
+        self.assertEqual(list(index), [entities[3], entities[0]])
+        self.world.enable_entity(entities[1])
+        self.assertEqual(len(index), 3)
+
+    def test_regions(self):
+        near, far, child = [self.world.create_entity() for _ in range(3)]
+        far.set_tag('FAR')
+        for entity in near, far, child:
+            entity.add_component(Counter(0))
+        self.world.add_entities(near, far, child)
+        self.world.register_entity_to_group(far, 'GROUP')
+        child.set_parent(far)
+        self.world.set_region(near, (0, 0))
+        self.world.set_region(far, (1, 0))
+        self.world.set_region(child, (1, 0))
+
+        records = self.world.unload_region((1, 0))
+        self.assertEqual(self.world.get_entities(), [near])
+        self.assertEqual(self.world.get_group('GROUP'), [])
+        self.assertEqual(self.world.get_entity_by_tag('FAR'), None)
+        self.assertEqual(self.world.get_regions(), [(0, 0)])
+
+        self.world.load_region((1, 0), records)
+        self.assertEqual(self.world.get_entity_by_tag('FAR'), far)
+        self.assertEqual(self.world.get_group('GROUP'), [far])
+        self.assertEqual(far.get_children(), [child])
+        self.assertEqual(self.world.get_region(child), (1, 0))
+        self.assertEqual(
+            len(self.world.get_entities_by_components(Counter)), 3)
+
+    def test_region_streaming(self):
+        for background in (False, True):
+            directory = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, directory)
+            world = World(checked=self.world.is_checked())
+            streaming = RegionStreamingSystem(RegionStore(directory),
+                                              background)
+            world.add_system(streaming)
+            world.add_system(CountSystem())
+            for region in range(3):
+                entity = world.create_entity()
+                entity.add_component(Counter(region))
+                world.add_entity(entity)
+                world.set_region(entity, region)
+
+            def tick():
+                world.process()
+                streaming.wait()
+
+            streaming.set_interest([0])
+            for _ in range(3):
+                tick()
+            self.assertEqual(world.get_regions(), [0])
+            self.assertEqual(streaming.get_loaded_regions(), set([0]))
+
+            streaming.set_interest([0, 2])
+            for _ in range(2):
+                tick()
+            self.assertEqual(sorted(world.get_regions()), [0, 2])
+            self.assertEqual(streaming.get_loaded_regions(), set([0, 2]))
+            counter = world.get_region_entities(2)[0].get_component(Counter)
+            if not background:
+                self.assertEqual(counter.count, 5)
+
+    def test_region_streaming_merges_moved_entities(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        streaming = RegionStreamingSystem(RegionStore(directory), False)
+        self.world.add_system(streaming)
+        resident = self.world.create_entity('RESIDENT')
+        self.world.add_entity(resident)
+        self.world.set_region(resident, 1)
+        self.world.process()
+        self.world.process()
+        self.assertEqual(self.world.get_entities(), [])
+
+        npc = self.world.create_entity('NPC')
+        self.world.add_entity(npc)
+        self.world.set_region(npc, 1)
+        self.world.process()
+        self.world.process()
+        self.assertEqual(self.world.get_entities(), [])
+
+        streaming.set_interest([1])
+        self.world.process()
+        tags = sorted(entity.get_tag()
+                      for entity in self.world.get_region_entities(1))
+        self.assertEqual(tags, ['NPC', 'RESIDENT'])
+
+    def test_region_streaming_retries_failed_merge(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        streaming = RegionStreamingSystem(RegionStore(directory), False)
+        self.world.add_system(streaming)
+        entity = self.world.create_entity('TAG')
+        self.world.add_entity(entity)
+        self.world.set_region(entity, 5)
+        self.world.process()
+        self.world.process()
+
+        blocker = self.world.create_entity('TAG')
+        self.world.add_entity(blocker)
+        streaming.set_interest([5])
+        with self.assertRaises(NonUniqueTagError):
+            self.world.process()
+        self.assertEqual(streaming.get_loaded_regions(), set())
+        blocker.kill()
+        self.world.process()
+        self.assertEqual(streaming.get_loaded_regions(), set([5]))
+        self.assertEqual(
+            self.world.get_region(self.world.get_entity_by_tag('TAG')), 5)
+
+    def test_region_streaming_store_failures(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        store = FlakyStore(directory)
+        streaming = RegionStreamingSystem(store, False)
+        self.world.add_system(streaming)
+        entity = self.world.create_entity('SAVED')
+        self.world.add_entity(entity)
+        self.world.set_region(entity, 1)
+        streaming.set_interest([1])
+        self.world.process()
+
+        store.fail_saves = True
+        streaming.set_interest([])
+        with self.assertRaises(IOError):
+            self.world.process()
+        self.assertEqual(self.world.get_entities(), [])
+        with self.assertRaises(IOError):
+            self.world.process()
+        streaming.set_interest([1])
+        self.world.process()
+        self.assertEqual(self.world.get_entity_by_tag('SAVED'), entity)
+
+        store.fail_saves = False
+        streaming.set_interest([])
+        self.world.process()
+        store.fail_loads = True
+        streaming.set_interest([1])
+        with self.assertRaises(IOError):
+            self.world.process()
+        store.fail_loads = False
+        self.world.process()
+        self.assertEqual(self.world.get_entity_by_tag('SAVED'), entity)
+        self.assertEqual(streaming.get_loaded_regions(), set([1]))
+
+    def test_ingest_queue(self):
+        ingest_queue = self.world.create_ingest_queue()
+        self.world.add_system(CountSystem())
+
+        def produce():
+            for _ in range(50):
+                entity = ingest_queue.spawn(components=[Counter(0)],
+                                            groups=['SPAWNED'])
+                ingest_queue.add_component(entity, Empty())
+        producers = [threading.Thread(target=produce) for _ in range(4)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+        self.assertEqual(self.world.get_entities(), [])
+
+        self.world.process()
+        self.assertEqual(
+            len(self.world.get_entities_by_components(Counter, Empty)), 200)
+        self.assertEqual(len(self.world.get_group('SPAWNED')), 200)
+        self.assertEqual(self.world.get_entities()[0].get_component(
+            Counter).count, 1)
+
+        entity = self.world.get_entities()[0]
+        ingest_queue.kill(entity)
+        ingest_queue.add_component(entity, Frozen())
+        self.world.process()
+        self.assertFalse(entity.is_alive())
+        self.assertEqual(len(self.world.get_entities()), 199)
+        self.assertEqual(ingest_queue.get_stats()['drained'], 402)
+
+    def test_ingest_queue_capacity(self):
+        ingest_queue = self.world.create_ingest_queue(capacity=2)
+        self.assertTrue(ingest_queue.spawn('FIRST') is not None)
+        self.assertTrue(ingest_queue.spawn('FIRST') is not None)
+        self.assertEqual(ingest_queue.spawn(), None)
+        stats = ingest_queue.get_stats()
+        self.assertEqual((stats['pending'], stats['rejected']), (2, 1))
+        other_queue = self.world.create_ingest_queue()
+        other_queue.spawn('SECOND')
+        self.world.add_system(CountSystem())
+        counter = self.world.create_entity()
+        counter.add_component(Counter(0))
+        self.world.add_entity(counter)
+
+        self.world.process()
+        self.assertEqual(self.world.get_entity_by_tag('FIRST').get_tag(),
+                         'FIRST')
+        self.assertTrue(self.world.get_entity_by_tag('SECOND') is not None)
+        self.assertEqual(counter.get_component(Counter).count, 1)
+        stats = ingest_queue.get_stats()
+        self.assertEqual((stats['pending'], stats['failed']), (0, 1))
+        errors = ingest_queue.pop_errors()
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(isinstance(errors[0], NonUniqueTagError))
+        self.assertEqual(ingest_queue.pop_errors(), [])
+
+        orphan = ingest_queue.spawn('FIRST')
+        ingest_queue.add_component(orphan, Counter(0))
+        ingest_queue.kill(orphan)
+        self.world.process()
+        self.assertFalse(orphan.is_alive())
+        self.assertEqual(ingest_queue.get_stats()['failed'], 2)
+        self.assertEqual(len(ingest_queue.pop_errors()), 1)
+
+        for _ in range(ingest_queue.max_errors + 10):
+            ingest_queue.spawn('FIRST')
+            self.world.process()
+        self.assertEqual(len(ingest_queue.pop_errors()),
+                         ingest_queue.max_errors)
+
+    def test_kill_deep_hierarchy(self):
+        chain = [self.world.create_entity() for _ in range(3000)]
+        self.world.add_entities(*chain)
+        for parent, child in zip(chain, chain[1:]):
+            child.set_parent(parent)
+        other = self.world.create_entity()
+        self.world.add_entity(other)
+        with self.assertRaises(CyclicHierarchyError):
+            chain[0].set_parent(chain[-1])
+
+        chain[0].kill()
+        self.assertEqual(self.world.get_entities(), [other])
+        for entity in chain:
+            self.assertFalse(entity.is_alive())
+
     ## Testing Systems
     def test_add_system(self):
         entity = self.world.create_entity()
@@ -151,6 +628,111 @@ class TestRui(unittest.TestCase):
         self.world.process()
         self.assertEqual(entity.get_component(Counter).count, 1)
 
+    def test_events(self):
+        entity = self.world.create_entity()
+        entity.add_component(Counter(2))
+        self.world.add_entity(entity)
+        health_system = HealthSystem()
+        self.world.add_system(health_system)
+        self.world.add_system(DamageSystem())
+        count_system = CountSystem()
+        self.world.add_system(count_system)
+        self.world.subscribe(count_system, Damage)
+
+        self.world.process()
+        self.assertEqual(health_system.damage, 0)
+        self.world.process()
+        self.assertEqual(health_system.damage, 2)
+        self.assertEqual(len(self.world.read_events(count_system, Damage)), 2)
+        self.assertEqual(self.world.read_events(count_system, Damage), [])
+        self.world.remove_system(count_system)
+        self.world.process()
+        self.assertEqual(health_system.damage, 5)
+        self.assertEqual(len(self.world.read_events(health_system, Damage)),
+                         1)
+        self.assertEqual(self.world.read_events(health_system, Damage), [])
+
+    def test_unsubscribed_events(self):
+        health_system = HealthSystem()
+        self.world.add_system(health_system)
+        self.world.unsubscribe(health_system, Damage)
+        self.world.publish_events(Damage(1), Damage(2))
+        with self.assertRaises(UnsubscribedSystemError):
+            self.world.read_events(health_system, Damage)
+        with self.assertRaises(UnmanagedSystemError):
+            self.world.subscribe(CountSystem(), Damage)
+
+    def test_resources(self):
+        clock = Clock()
+        self.world.add_resource(clock)
+        self.world.add_system(ClockSystem())
+        self.world.process()
+        self.assertEqual(self.world.get_resource(Clock).time, 1)
+        replacement = Clock()
+        self.world.add_resource(replacement)
+        self.world.process()
+        self.assertEqual(clock.time, 1)
+        self.assertEqual(replacement.time, 1)
+        self.world.remove_resource(Clock)
+        self.assertFalse(self.world.has_resource(Clock))
+        with self.assertRaises(UnmanagedResourceError):
+            self.world.process()
+
+    def test_undeclared_resource(self):
+        self.world.add_resource(Clock())
+        count_system = CountSystem()
+        self.world.add_system(count_system)
+        if self.world.is_checked():
+            with self.assertRaises(UndeclaredResourceError):
+                count_system.get_resource(Clock)
+        else:
+            self.assertEqual(count_system.get_resource(Clock).time, 0)
+
+    def test_run(self):
+        entity = self.world.create_entity()
+        entity.add_component(Counter(0))
+        self.world.add_entity(entity)
+        self.world.add_system(CountSystem())
+        self.assertEqual(self.world.run(10), 10)
+        self.assertEqual(entity.get_component(Counter).count, 10)
+
+        ran = self.world.run(
+            until=lambda world: entity.get_component(Counter).count >= 15)
+        self.assertEqual(ran, 5)
+
+        self.world.set_delta(1.5)
+        self.world.run(2, substep=1)
+        self.assertEqual(entity.get_component(Counter).count, 18)
+        self.assertEqual(self.world.run(1, substep=1), 1)
+        self.assertEqual(entity.get_component(Counter).count, 19)
+
+        self.world.run(1)
+        self.world.run(1, substep=2)
+        self.assertEqual(entity.get_component(Counter).count, 20.5)
+
+        ingest_queue = self.world.create_ingest_queue()
+        ingest_queue.spawn('SPAWNED')
+        self.world.run(1, substep=10)
+        self.assertTrue(self.world.get_entity_by_tag('SPAWNED') is not None)
+        with self.assertRaises(TypeError):
+            self.world.run()
+        for substep in (0, -1):
+            with self.assertRaises(ValueError):
+                self.world.run(1, substep=substep)
+
+    def test_run_batch(self):
+        entity = self.world.create_entity()
+        entity.add_component(Counter(0))
+        self.world.add_entity(entity)
+        self.world.add_system(BatchCountSystem())
+        metrics = []
+        self.world.add_metrics_listener(metrics.append)
+        self.world.run(1000, batch=True)
+        self.assertEqual(len(metrics), 1)
+        self.assertEqual(entity.get_component(Counter).count, 1000)
+        with self.assertRaises(TypeError):
+            self.world.run(10, substep=1, batch=True)
+
     ## Test Exceptions
     def test_duplicate_entity_error(self):
         entity = self.world.create_entity()
@@ -194,5 +776,28 @@ class TestRui(unittest.TestCase):
     def tearDown(self):
         pass
 
+
+class TestUncheckedRui(TestRui):
+
+    def setUp(self):
+        self.world = World(checked=False)
+
+    def test_unchecked_entities(self):
+        self.assertFalse(self.world.is_checked())
+        entity = self.world.create_entity()
+        self.assertTrue(isinstance(entity, UncheckedEntity))
+        self.world.add_entity(entity)
+        self.assertEqual(entity, self.world.get_entities()[0])
+        entity.kill()
+        with self.assertRaises(DeadEntityError):
+            self.world.add_entity(entity)
+
+    def test_checked_entity_in_unchecked_world(self):
+        entity = Entity()
+        self.world.add_entity(entity)
+        entity.kill()
+        with self.assertRaises(DeadEntityError):
+            entity.get_components()
+
 if __name__ == '__main__':
     unittest.main()